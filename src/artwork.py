@@ -44,7 +44,12 @@ class Artwork:
         if not art_files:
             return False
         # Update to last file.
-        self.img = Image.open(art_files[0]).convert('RGBA')
+        art = Image.open(art_files[0])
+        # When not saving, let the JPEG decoder target display size,
+        # decoding far fewer pixels.
+        if not self.do_save:
+            art.draft('RGB', (200, 200))
+        self.img = art.convert('RGBA')
         # If set, save artwork.
         if self.do_save:
             self.save()
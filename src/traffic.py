@@ -11,6 +11,9 @@ from . import DUMP, SAVES
 
 # For processing traffic tiles.
 class TrafficTile:
+    # Fixed attributes; avoids a per-instance dict in the tile loop.
+    __slots__ = ('filename', 'x', 'y', 'img')
+
     def __init__(self, filename):
         self.filename = filename
         # x and y coordinates of tile in map.
@@ -1,21 +1,66 @@
 import math
+import mmap
 import os
 import re
-from glob import glob
-from pathlib import Path
+from functools import lru_cache
 
 from PIL import Image
 
 from . import DUMP, MAP_FILE, MAPS
 
+# Precompiled patterns for parsing radar config files.
+CONFIG_RE = re.compile(rb'^(DWR_Area_ID|Coordinates)=(.*)$', re.MULTILINE)
+COORD_RE = re.compile(r'[-+]?\d*\.\d+|\d+')
+
+# Max latitude of US map in a linear form.
+LAT_MAX = 1.0799224683069641
+# Reference latitude in linear form.
+REF_LAT = 0.7380009964270406
+# Scales and offset from known locations on the map, computed at import.
+X_OFFSET = 130.781250
+X_SCALE = 7162 / 39.34135
+Y_SCALE = 3565 / (LAT_MAX - REF_LAT)
+
+
+# Convert a latitude to its linear form.
+def lat_to_linear(lat):
+    return LAT_MAX - math.asinh(math.tan(math.radians(lat)))
+
+
+# Compute the US map crop box (in pixels) for an area's bounding coordinates.
+def crop_box(lat1, lon1, lat2, lon2):
+    return (
+        int((lon1 + X_OFFSET) * X_SCALE),
+        int(lat_to_linear(lat1) * Y_SCALE),
+        int((lon2 + X_OFFSET) * X_SCALE),
+        int(lat_to_linear(lat2) * Y_SCALE)
+    )
+
+
+# Load and decode the US map once, keyed on path and mtime.
+@lru_cache(maxsize=1)
+def load_us_map(path, mtime):
+    img = Image.open(path)
+    # Force the decode now so cache hits skip it entirely.
+    img.load()
+    return img
+
+
+# Render a 900x900 RGBA area map for a crop box, memoized per box.
+@lru_cache(maxsize=16)
+def render_area(x1, y1, x2, y2):
+    us_map = load_us_map(MAP_FILE, os.path.getmtime(MAP_FILE))
+    # Convert once, then resize in the final mode with a fast
+    # reduce() pre-pass instead of two full passes over the pixels.
+    return us_map.crop((x1, y1, x2, y2)).convert('RGBA').resize(
+        (900, 900),
+        Image.BILINEAR,
+        reducing_gap=2.0
+    )
+
 
 # Obtains area maps in the US to overlay radar images on.
 class AreaMap:
-    # Max latitude of US map in a linear form.
-    LAT_MAX = 1.0799224683069641
-    # Reference latitude in linear form.
-    REF_LAT = 0.7380009964270406
-
     def __init__(self):
         # Coordinates of area.
         self.lat1 = None
@@ -26,6 +71,10 @@ class AreaMap:
         self.area_id = None
         # The area map.
         self.map = None
+        # Cached path of the rendered map file.
+        self.map_file = None
+        # Whether a complete config has been loaded.
+        self.configured = False
 
     # Get map configuration information.
     def get_config(self):
@@ -33,64 +82,73 @@ class AreaMap:
 
         :return: True if successful, False if not
         """
-        # Look for any radar map config files.
-        files = glob(os.path.join(DUMP, '*DWRI*'))
-        if not files:
+        # Look for a radar map config file, stopping at the first match.
+        # A substring check on scandir entries skips glob's fnmatch regex.
+        file_path = None
+        try:
+            with os.scandir(DUMP) as entries:
+                for entry in entries:
+                    if 'DWRI' in entry.name:
+                        file_path = entry.path
+                        break
+        except FileNotFoundError:
+            # No dump directory yet; no config to load.
+            return False
+        if file_path is None:
             return False
-        # Extract info from first file.
-        file = open(files[0], 'r')
-        for line in file:
-            if 'DWR_Area_ID' in line:
-                self.area_id = re.findall(r'\"(.+?)\"', line)[0]
-            elif 'Coordinates' in line:
-                coords = re.findall(r"[-+]?\d*\.\d+|\d+", line)
-                self.lat1, self.lon1, self.lat2, self.lon2 = (float(x) for x in coords)
-        return True
+        # Scan the file pages directly via mmap, decoding only matched
+        # values instead of copying the whole file into a string.
+        with open(file_path, 'rb') as file:
+            # An empty file cannot be mapped (and has no config anyway).
+            if os.fstat(file.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as text:
+                for match in CONFIG_RE.finditer(text):
+                    key = match.group(1)
+                    value = match.group(2).decode()
+                    if key == b'DWR_Area_ID':
+                        self.area_id = value.strip().strip('\'"')
+                        # Invalidate the cached map file path.
+                        self.map_file = None
+                    else:
+                        # Expect exactly two lat/lon pairs; ignore malformed lines.
+                        coords = COORD_RE.findall(value)
+                        if len(coords) != 4:
+                            continue
+                        self.lat1, self.lon1, self.lat2, self.lon2 = (float(x) for x in coords)
+        # Configured only once both the area ID and coordinates are known.
+        self.configured = self.area_id is not None and self.lat1 is not None
+        return self.configured
 
     # Checks if a config file has been received.
     def has_config(self):
-        return self.area_id is not None
+        return self.configured
+
+    # Path of the rendered map file for the current area.
+    def get_map_file(self):
+        if self.map_file is None:
+            name = '{0}.png'.format(self.area_id)
+            self.map_file = os.path.join(MAPS, name)
+        return self.map_file
 
     # Render an area map from the US map.
     def render(self):
-        # Open US map.
-        us_map = Image.open(MAP_FILE)
-        # Convert latitudes to a linear form.
-        self.lat1 = AreaMap.LAT_MAX - math.asinh(math.tan(math.radians(self.lat1)))
-        self.lat2 = AreaMap.LAT_MAX - math.asinh(math.tan(math.radians(self.lat2)))
-        # Calculate x-coords using a ratio of a known location on the map.
-        x1 = (self.lon1 + 130.781250) * 7162 / 39.34135
-        x2 = (self.lon2 + 130.781250) * 7162 / 39.34135
-        # Use another ratio of a known location to find the latitudes.
-        den = AreaMap.LAT_MAX - AreaMap.REF_LAT
-        y1 = self.lat1 * 3565 / den
-        y2 = self.lat2 * 3565 / den
-        # Crop the map.
-        cropped = us_map.crop((
-            int(x1),
-            int(y1),
-            int(x2),
-            int(y2)
-        ))
-        # Resize to 900x900, convert to right format, and save.
-        self.map = cropped.resize((900, 900))
-        self.map = self.map.convert('RGBA')
-        name = '{0}.png'.format(self.area_id)
-        self.map.save(os.path.join(MAPS, name))
+        # Crop and render the area, memoized by crop box.
+        box = crop_box(self.lat1, self.lon1, self.lat2, self.lon2)
+        self.map = render_area(*box)
+        # Fast zlib setting; the cache trades disk size for encode speed.
+        self.map.save(self.get_map_file(), format='PNG', compress_level=1)
 
     # Get an area map for the predefined area.
     def get_map(self):
         # If already in memory, just return it.
         if self.map is not None:
             return self.map
-        # Check if an area map has already been rendered.
-        name = '{0}.png'.format(self.area_id)
-        file = Path(os.path.join(MAPS, name))
-        if file.is_file():
-            # Open and return image.
-            self.map = Image.open(file.absolute()).convert('RGBA')
-            return self.map
-        else:
-            # Else, render it and return.
+        # Try an already-rendered map on disk; render always saves in
+        # RGBA, so no mode conversion is needed on load.
+        try:
+            self.map = Image.open(self.get_map_file())
+        except FileNotFoundError:
+            # Else, render it.
             self.render()
-            return self.map
+        return self.map